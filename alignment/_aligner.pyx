@@ -0,0 +1,93 @@
+# cython: boundscheck=False, wraparound=False, language_level=3
+# Compiled variant of the global matrix fill. This mirrors the numba kernel
+# and the NumPy wavefront fill in sequencealigner.py cell for cell; keep the
+# three implementations in sync when the recurrence changes.
+
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def fillGlobalMatrix(int[::1] first, int[::1] second,
+                     int match, int mismatch, int gapStart, int gapExtension,
+                     bint fastBacktrace,
+                     int[:, :, ::1] scores, unsigned char[:, :, ::1] directions):
+    cdef int F = 0, IX = 1, IY = 2
+    cdef int m = scores.shape[1]
+    cdef int n = scores.shape[2]
+    cdef int i, j, j0, jHi, s, extension
+    cdef int TILE = 64
+    cdef int prevF, prevIx, prevIy, maxScore
+    cdef unsigned char mask
+
+    for j0 in range(1, n, TILE):
+        # Column strips keep the two active rows of all three matrices in L1.
+        jHi = min(n, j0 + TILE)
+        for i in range(1, m):
+            for j in range(j0, jHi):
+                # Match elements.
+                prevF = scores[F, i - 1, j - 1]
+                prevIx = scores[IX, i - 1, j - 1]
+                prevIy = scores[IY, i - 1, j - 1]
+                maxScore = max(prevF, prevIx, prevIy)
+                mask = 0
+                if prevF == maxScore:
+                    mask |= 1 << F
+                if prevIx == maxScore:
+                    mask |= 1 << IX
+                if prevIy == maxScore:
+                    mask |= 1 << IY
+                if fastBacktrace:
+                    # Only the first tied direction is ever followed.
+                    mask &= -mask & 0xff
+                s = match if first[i - 1] == second[j - 1] else mismatch
+                scores[F, i, j] = maxScore + s
+                directions[F, i, j] = mask
+
+                # Gap on first sequence.
+                if i == m - 1:
+                    prevF = scores[F, i, j - 1]
+                    prevIx = scores[IX, i, j - 1]
+                    prevIy = scores[IY, i, j - 1]
+                    extension = 0
+                else:
+                    prevF = scores[F, i, j - 1] + gapStart
+                    prevIx = scores[IX, i, j - 1]
+                    prevIy = scores[IY, i, j - 1] + gapStart
+                    extension = gapExtension
+                maxScore = max(prevF, prevIx, prevIy)
+                mask = 0
+                if prevF == maxScore:
+                    mask |= 1 << F
+                if prevIx == maxScore:
+                    mask |= 1 << IX
+                if prevIy == maxScore:
+                    mask |= 1 << IY
+                if fastBacktrace:
+                    mask &= -mask & 0xff
+                scores[IX, i, j] = maxScore + extension
+                directions[IX, i, j] = mask
+
+                # Gap on second sequence.
+                if j == n - 1:
+                    prevF = scores[F, i - 1, j]
+                    prevIx = scores[IX, i - 1, j]
+                    prevIy = scores[IY, i - 1, j]
+                    extension = 0
+                else:
+                    prevF = scores[F, i - 1, j] + gapStart
+                    prevIx = scores[IX, i - 1, j] + gapStart
+                    prevIy = scores[IY, i - 1, j]
+                    extension = gapExtension
+                maxScore = max(prevF, prevIx, prevIy)
+                mask = 0
+                if prevF == maxScore:
+                    mask |= 1 << F
+                if prevIx == maxScore:
+                    mask |= 1 << IX
+                if prevIy == maxScore:
+                    mask |= 1 << IY
+                if fastBacktrace:
+                    mask &= -mask & 0xff
+                scores[IY, i, j] = maxScore + extension
+                directions[IY, i, j] = mask
@@ -1,8 +1,4 @@
-from six import iteritems
-from six import itervalues
-from six import text_type
-from six.moves import builtins
-
+import functools
 import operator
 
 from .sequence import Sequence
@@ -24,19 +20,19 @@ class SoftElement(object):
 
     def mergedWith(self, other):
         weights = dict(self.__weights)
-        for element, weight in iteritems(other.__weights):
+        for element, weight in other.__weights.items():
             weights[element] = weights.get(element, 0) + weight
         return SoftElement(weights)
 
     def pairs(self):
-        return iteritems(self.__weights)
+        return self.__weights.items()
 
     def sorted(self):
-        return sorted(iteritems(self.__weights), key=lambda w: (-w[1], w[0]))
+        return sorted(self.__weights.items(), key=lambda w: (-w[1], w[0]))
 
     def probabilities(self):
-        t = sum(itervalues(self.__weights))
-        return dict((e, float(w) / t) for e, w in iteritems(self.__weights))
+        t = sum(self.__weights.values())
+        return dict((e, float(w) / t) for e, w in self.__weights.items())
 
     def toDict(self):
         return self.__weights
@@ -67,13 +63,6 @@ class SoftElement(object):
         else:
             return '{%s}' % (','.join('%s:%d' % w for w in weights))
 
-    def __unicode__(self):
-        weights = self.sorted()
-        if len(weights) == 1:
-            return text_type(weights[0][0])
-        else:
-            return u'{%s}' % (u','.join(u'%s:%d' % w for w in weights))
-
 
 class Profile(Sequence):
 
@@ -120,17 +109,15 @@ class Profile(Sequence):
         return max(len(e) for e in self.elements)
 
     def maxVariationCount(self):
-        # Silence code inspection warning. `builtins.reduce` should hopefully
-        # work both in Python 2 and Python 3.
-        # noinspection PyCompatibility,PyUnresolvedReferences
-        return builtins.reduce(operator.mul, (len(e) for e in self.elements))
+        return functools.reduce(
+            operator.mul, (len(e) for e in self.elements))
 
     def mergeWith(self, other):
         if len(self) != len(other):
             raise ValueError(
                 'profiles with different lengths cannot be merged')
         self.elements = [a.mergedWith(b)
-                         for a, b in builtins.zip(self.elements, other.elements)]
+                         for a, b in zip(self.elements, other.elements)]
 
     def toDict(self):
         return [e.toDict() for e in self.elements]
@@ -1,7 +1,7 @@
-from six import iteritems
-
 from abc import ABCMeta
 
+import numpy as np
+
 from .sequence import GAP_CODE
 from .profile import SoftElement
 from .profile import Profile
@@ -22,8 +22,8 @@ class SoftScoring(Scoring):
 
     def __call__(self, firstElement, secondElement):
         score = 0.0
-        for a, p in iteritems(firstElement.probabilities()):
-            for b, q in iteritems(secondElement.probabilities()):
+        for a, p in firstElement.probabilities().items():
+            for b, q in secondElement.probabilities().items():
                 score += p * q * self.scoring(a, b)
         return score
 
@@ -32,12 +32,13 @@ class SoftScoring(Scoring):
 
 class ProfileAlignment(SequenceAlignment):
 
-    def __init__(self, first, second, gap=GAP_CODE, other=None):
+    def __init__(self, first, second, gap=GAP_CODE, other=None, dtype=None):
         if isinstance(gap, SoftElement):
             softGap = gap
         else:
             softGap = SoftElement({gap: 1})
-        super(ProfileAlignment, self).__init__(first, second, softGap, other)
+        super(ProfileAlignment, self).__init__(first, second, softGap, other,
+                                               dtype)
 
 
 # Aligner ---------------------------------------------------------------------
@@ -47,7 +48,8 @@ class ProfileAligner(SequenceAligner):
     __metaclass__ = ABCMeta
 
     def emptyAlignment(self, first, second):
-        return ProfileAlignment(Profile(), Profile())
+        # SoftScoring returns expected values, which are floats.
+        return ProfileAlignment(Profile(), Profile(), dtype=np.float64)
 
 
 class GlobalProfileAligner(ProfileAligner, GlobalSequenceAligner):
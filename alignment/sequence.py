@@ -1,5 +1,4 @@
-from __future__ import print_function
-from six import text_type
+import numpy as np
 
 
 GAP_ELEMENT = '-'
@@ -55,14 +54,6 @@ class BaseSequence(object):
         result += ' '.join(str(e) for e in self.elements)
         return result
 
-    def __unicode__(self):
-        if self.id is None:
-            result = u''
-        else:
-            result = u'> %s\n' % self.id
-        result += u' '.join(text_type(e) for e in self.elements)
-        return result
-
 
 class Sequence(BaseSequence):
 
@@ -80,13 +71,18 @@ class Sequence(BaseSequence):
 
 
 class EncodedSequence(BaseSequence):
+    # Codes are kept in a preallocated int32 array behind a fill pointer, so
+    # push and pop are single indexed stores and loads with no boxing and
+    # reversed() is one sliced copy.
 
     def __init__(self, argument, id=None):
         if isinstance(argument, int):
-            super(EncodedSequence, self).__init__([0] * argument, id)
+            super(EncodedSequence, self).__init__(
+                np.zeros(argument, dtype=np.int32), id)
             self.position = 0
         else:
-            super(EncodedSequence, self).__init__(list(argument), id)
+            super(EncodedSequence, self).__init__(
+                np.array(argument, dtype=np.int32), id)
             self.position = len(self.elements)
 
     def push(self, element):
@@ -102,10 +98,18 @@ class EncodedSequence(BaseSequence):
 
     def reversed(self):
         return EncodedSequence(
-            self.elements[self.position - len(self.elements) - 1::-1],
+            self.elements[:self.position][::-1],
             id=self.id,
         )
 
+    def __eq__(self, other):
+        if self.id is None or other.id is None:
+            return self.key() == other.key()
+        else:
+            return self.id == other.id
+
+    __hash__ = BaseSequence.__hash__
+
     def __len__(self):
         return self.position
 
@@ -1,8 +1,7 @@
+import multiprocessing
 from enum import IntEnum
-import sys
 
-from six import text_type
-from six.moves import range
+import numpy as np
 
 from abc import ABCMeta, ABC
 from abc import abstractmethod
@@ -10,6 +9,26 @@ from abc import abstractmethod
 from .sequence import GAP_CODE
 from .sequence import EncodedSequence
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    from . import _aligner
+except ImportError:
+    _aligner = None
+
+try:
+    import parasail
+except ImportError:
+    parasail = None
+
+try:
+    import cupy
+except ImportError:
+    cupy = None
+
 
 # Scoring ---------------------------------------------------------------------
 
@@ -57,19 +76,26 @@ class SimpleScoring(GapScoring, Scoring):
 
 class SequenceAlignment(object):
 
-    def __init__(self, first, second, gap=GAP_CODE, other=None):
+    def __init__(self, first, second, gap=GAP_CODE, other=None, dtype=None):
         self.first = first
         self.second = second
         self.gap = gap
         if other is None:
-            self.scores = [0] * len(first)
+            # A preallocated array behind a fill pointer keeps column scores
+            # unboxed and makes push and pop single indexed stores and loads,
+            # like the sequence buffers. The aligner passes the dtype it
+            # scores with: float64 for scorings that return floats.
+            self.scores = np.zeros(len(first.elements),
+                                   dtype=np.int32 if dtype is None else dtype)
+            self.n = 0
             self.score = 0
             self.identicalCount = 0
             self.similarCount = 0
             self.gapCount = 0
             self.preservedCount = 0
         else:
-            self.scores = list(other.scores)
+            self.scores = other.scores.copy()
+            self.n = other.n
             self.score = other.score
             self.identicalCount = other.identicalCount
             self.similarCount = other.similarCount
@@ -79,7 +105,15 @@ class SequenceAlignment(object):
     def push(self, firstElement, secondElement, score=0):
         self.first.push(firstElement)
         self.second.push(secondElement)
-        self.scores.append(score)
+        if self.n == len(self.scores):
+            # Profiles grow by appends, so their alignments start with no
+            # preallocated capacity; double on demand like a list would.
+            grown = np.zeros(max(16, 2 * len(self.scores)),
+                             dtype=self.scores.dtype)
+            grown[:self.n] = self.scores
+            self.scores = grown
+        self.scores[self.n] = score
+        self.n += 1
         self.score += score
         if firstElement == secondElement:
             self.identicalCount += 1
@@ -93,7 +127,8 @@ class SequenceAlignment(object):
     def pop(self):
         firstElement = self.first.pop()
         secondElement = self.second.pop()
-        score = self.scores.pop()
+        self.n -= 1
+        score = self.scores[self.n].item()
         self.score -= score
         if firstElement == secondElement:
             self.identicalCount -= 1
@@ -160,82 +195,821 @@ class SequenceAlignment(object):
         return repr((self.first, self.second))
 
     def __str__(self):
-        first = [str(e) for e in self.first.elements]
-        second = [str(e) for e in self.second.elements]
-        for i in range(len(first)):
-            n = max(len(first[i]), len(second[i]))
-            format = '%-' + str(n) + 's'
-            first[i] = format % first[i]
-            second[i] = format % second[i]
-        return '%s\n%s' % (' '.join(first), ' '.join(second))
-
-    def __unicode__(self):
-        first = [text_type(e) for e in self.first.elements]
-        second = [text_type(e) for e in self.second.elements]
-        for i in range(len(first)):
-            n = max(len(first[i]), len(second[i]))
-            format = u'%-' + text_type(n) + u's'
-            first[i] = format % first[i]
-            second[i] = format % second[i]
-        return u'%s\n%s' % (u' '.join(first), u' '.join(second))
+        # Pad both rows column by column in whole-array operations instead of
+        # one Python format call per element.
+        first = np.array([str(e) for e in self.first.elements], dtype=str)
+        second = np.array([str(e) for e in self.second.elements], dtype=str)
+        if first.size == 0:
+            return '\n'
+        widths = np.maximum(np.char.str_len(first), np.char.str_len(second))
+        return '%s\n%s' % (' '.join(np.char.ljust(first, widths)),
+                           ' '.join(np.char.ljust(second, widths)))
 
 
 # Aligner ---------------------------------------------------------------------
-def make_matrix(shape, factory):
-    i, j = shape
-    result = []
-    for col in range(0, i):
-        result.append([])
-        for row in range(0, j):
-            result[col].append(factory())
-            
-    return result
 
 class MatrixType(IntEnum):
-    F = 1
-    IX = 2
-    IY = 3
+    F = 0
+    IX = 1
+    IY = 2
+
+# Tie masks decoded once for all: entry m lists the directions whose bits are
+# set in m, highest type first, as consumed by the backtrace stacks.
+_DIRECTIONS_BY_MASK = tuple(
+    tuple(t for t in reversed(list(MatrixType)) if m >> t & 1)
+    for m in range(1 << len(MatrixType)))
 
 class AlignmentMatrix:
-    def __init__(self, shape=(0,0)):
+    # Scores are kept in one contiguous (3, m, n) integer buffer indexed by
+    # MatrixType on the first axis; directions are packed into a (3, m, n)
+    # uint8 buffer where bit t is set iff MatrixType(t) is part of the tie.
+    # The score dtype defaults to int32; the aligners pass int16 when a
+    # conservative bound proves the scores fit, halving the fill's memory
+    # traffic, and float64 when the scoring can produce non-integral scores. In rolling mode only two rows per matrix are allocated and
+    # row i maps to i & 1. The fill recurrences read one row back at most,
+    # so this is enough for score-only passes and drops memory from O(mn)
+    # to O(n).
+    SCORE_DTYPE = np.int32
+
+    def __init__(self, shape=(0,0), rolling=False, dtype=None):
         self.shape = shape
-        self.matrix = {
-            MatrixType.F: make_matrix(shape, int),
-            MatrixType.IX: make_matrix(shape, int),
-            MatrixType.IY: make_matrix(shape, int)
-        }
-        self.direction = {
-            MatrixType.F: make_matrix(shape, list),
-            MatrixType.IX: make_matrix(shape, list),
-            MatrixType.IY: make_matrix(shape, list)
-        }
+        self.rolling = rolling
+        rows = 2 if rolling else shape[0]
+        self.scores = np.zeros(
+            (len(MatrixType), rows) + shape[1:],
+            dtype=self.SCORE_DTYPE if dtype is None else dtype)
+        self.directions = np.zeros(
+            (len(MatrixType), rows) + shape[1:], dtype=np.uint8)
+
+    def _row(self, i):
+        if self.rolling:
+            return (i % self.shape[0]) & 1
+        return i
 
     def getScore(self, type, i, j):
-        return self.matrix[type][i][j]
+        return self.scores[type, self._row(i), j].item()
 
     def setScore(self, type, i, j, score):
-        self.matrix[type][i][j] = score
+        self.scores[type, self._row(i), j] = score
 
     def getDirection(self, type, i, j):
-        return self.direction[type][i][j]
+        mask = self.directions[type, self._row(i), j]
+        return [t for t in MatrixType if mask >> t & 1]
 
     def setDirection(self, type, i, j, direction):
-        self.direction[type][i][j] = direction
-    
+        mask = 0
+        for t in direction:
+            mask |= 1 << t
+        self.directions[type, self._row(i), j] = mask
+
+    def getDirectionMask(self, type, i, j):
+        return int(self.directions[type, self._row(i), j])
+
+    def setDirectionMask(self, type, i, j, mask):
+        self.directions[type, self._row(i), j] = mask
+
+    def minScore(self):
+        # A safe "minus infinity" for border cells: small enough to never win
+        # a max(), large enough to not overflow when a gap score is added.
+        if self.scores.dtype.kind == 'f':
+            return float(np.finfo(self.scores.dtype).min) / 2
+        return int(np.iinfo(self.scores.dtype).min) // 2
+
     def max(self):
-        return max(
-            max(map(max, self.matrix[type])) for type in MatrixType
-        )
+        return self.scores.max().item()
+
+
+# Fill kernels ----------------------------------------------------------------
+# The O(mn) matrix fills are the hot path; when the scoring is a plain
+# SimpleScoring, the aligners delegate to one of the kernels below instead of
+# the per-cell Python loops: a compiled numba kernel when numba is installed,
+# or a NumPy wavefront fill otherwise. The kernels mirror the Python fallbacks
+# exactly, including direction-tie bitmasks and border conventions.
+
+# Column-strip width for the compiled kernels; 64 int32 cells per matrix row
+# keep a strip's working set inside L1.
+_TILE = 64
+
+
+def _encodedElements(sequence):
+    try:
+        return np.asarray(sequence.elements[:len(sequence)], dtype=np.int32)
+    except (TypeError, ValueError):
+        return None
+
+
+def _packEncodedElements(sequences):
+    arrays = []
+    for sequence in sequences:
+        array = _encodedElements(sequence)
+        if array is None:
+            return None, None
+        arrays.append(array)
+    lengths = np.array([len(array) for array in arrays], dtype=np.int64)
+    packed = np.zeros((len(arrays), int(lengths.max())), dtype=np.int32)
+    for index, array in enumerate(arrays):
+        packed[index, :len(array)] = array
+    return packed, lengths
+
+
+def _substitutionMatrix(first, second, match, mismatch, dtype):
+    return np.where(first[:, None] == second[None, :], match, mismatch) \
+        .astype(dtype)
+
+
+def _tieMask(prevF, prevIx, prevIy, maxScore):
+    return ((prevF == maxScore).astype(np.uint8)
+            | ((prevIx == maxScore).astype(np.uint8) << np.uint8(MatrixType.IX))
+            | ((prevIy == maxScore).astype(np.uint8) << np.uint8(MatrixType.IY)))
+
+
+def _antidiagonals(m, n):
+    # Cells on the antidiagonal i + j = k depend only on the antidiagonals
+    # k - 1 and k - 2, so each one can be filled with whole-array operations.
+    for k in range(2, m + n - 1):
+        ii = np.arange(max(1, k - n + 1), min(m - 1, k - 1) + 1)
+        yield ii, k - ii
+
+
+def _fillGlobalMatrixWavefront(first, second, match, mismatch,
+                               gapStart, gapExtension, fastBacktrace,
+                               scores, directions):
+    F, IX, IY = MatrixType.F, MatrixType.IX, MatrixType.IY
+    m = scores.shape[1]
+    n = scores.shape[2]
+    sub = _substitutionMatrix(first, second, match, mismatch, scores.dtype)
+    for ii, jj in _antidiagonals(m, n):
+        # Match elements.
+        prevF = scores[F, ii - 1, jj - 1]
+        prevIx = scores[IX, ii - 1, jj - 1]
+        prevIy = scores[IY, ii - 1, jj - 1]
+        maxScore = np.maximum(np.maximum(prevF, prevIx), prevIy)
+        mask = _tieMask(prevF, prevIx, prevIy, maxScore)
+        if fastBacktrace:
+            # Only the first tied direction is ever followed.
+            mask &= ~mask + np.uint8(1)
+        scores[F, ii, jj] = maxScore + sub[ii - 1, jj - 1]
+        directions[F, ii, jj] = mask
+
+        # Gap on first sequence. The last row takes no gap penalties.
+        lastRow = ii == m - 1
+        prevF = scores[F, ii, jj - 1] + np.where(lastRow, 0, gapStart)
+        prevIx = scores[IX, ii, jj - 1]
+        prevIy = scores[IY, ii, jj - 1] + np.where(lastRow, 0, gapStart)
+        maxScore = np.maximum(np.maximum(prevF, prevIx), prevIy)
+        mask = _tieMask(prevF, prevIx, prevIy, maxScore)
+        if fastBacktrace:
+            mask &= ~mask + np.uint8(1)
+        scores[IX, ii, jj] = maxScore + np.where(lastRow, 0, gapExtension)
+        directions[IX, ii, jj] = mask
+
+        # Gap on second sequence. The last column takes no gap penalties.
+        lastColumn = jj == n - 1
+        prevF = scores[F, ii - 1, jj] + np.where(lastColumn, 0, gapStart)
+        prevIx = scores[IX, ii - 1, jj] + np.where(lastColumn, 0, gapStart)
+        prevIy = scores[IY, ii - 1, jj]
+        maxScore = np.maximum(np.maximum(prevF, prevIx), prevIy)
+        mask = _tieMask(prevF, prevIx, prevIy, maxScore)
+        if fastBacktrace:
+            mask &= ~mask + np.uint8(1)
+        scores[IY, ii, jj] = maxScore + np.where(lastColumn, 0, gapExtension)
+        directions[IY, ii, jj] = mask
+
+
+def _fillStrictGlobalMatrixWavefront(first, second, match, mismatch,
+                                     gapScore, scores):
+    F = MatrixType.F
+    m = scores.shape[1]
+    n = scores.shape[2]
+    sub = _substitutionMatrix(first, second, match, mismatch, scores.dtype)
+    for ii, jj in _antidiagonals(m, n):
+        # Match elements.
+        ab = scores[F, ii - 1, jj - 1] + sub[ii - 1, jj - 1]
+
+        # Gap on first sequence.
+        ga = scores[F, ii, jj - 1] + gapScore
+
+        # Gap on second sequence.
+        gb = scores[F, ii - 1, jj] + gapScore
+
+        scores[F, ii, jj] = np.maximum(np.maximum(ab, ga), gb)
+
+
+def _fillLocalMatrixWavefront(first, second, match, mismatch,
+                              gapStart, gapExtension, scores, directions):
+    F, IX, IY = MatrixType.F, MatrixType.IX, MatrixType.IY
+    m = scores.shape[1]
+    n = scores.shape[2]
+    sub = _substitutionMatrix(first, second, match, mismatch, scores.dtype)
+    for ii, jj in _antidiagonals(m, n):
+        # Match elements.
+        prevF = scores[F, ii - 1, jj - 1]
+        prevIx = scores[IX, ii - 1, jj - 1]
+        prevIy = scores[IY, ii - 1, jj - 1]
+        maxScore = np.maximum(np.maximum(prevF, prevIx), prevIy)
+        mask = _tieMask(prevF, prevIx, prevIy, maxScore)
+        # Keep only the first direction of the tie when nothing is gained.
+        mask = np.where(maxScore > 0, mask, mask & (~mask + np.uint8(1)))
+        scores[F, ii, jj] = np.maximum(0, maxScore + sub[ii - 1, jj - 1])
+        directions[F, ii, jj] = mask
+
+        # Gap on sequenceA.
+        prevF = scores[F, ii, jj - 1] + gapStart
+        prevIx = scores[IX, ii, jj - 1]
+        prevIy = scores[IY, ii, jj - 1] + gapStart
+        maxScore = np.maximum(np.maximum(prevF, prevIx), prevIy)
+        scores[IX, ii, jj] = np.maximum(0, maxScore + gapExtension)
+        directions[IX, ii, jj] = _tieMask(prevF, prevIx, prevIy, maxScore)
+
+        # Gap on sequenceB.
+        prevF = scores[F, ii - 1, jj] + gapStart
+        prevIx = scores[IX, ii - 1, jj] + gapStart
+        prevIy = scores[IY, ii - 1, jj]
+        maxScore = np.maximum(np.maximum(prevF, prevIx), prevIy)
+        scores[IY, ii, jj] = np.maximum(0, maxScore + gapExtension)
+        directions[IY, ii, jj] = _tieMask(prevF, prevIx, prevIy, maxScore)
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _fillGlobalMatrix(first, second, match, mismatch,
+                          gapStart, gapExtension, band, fastBacktrace,
+                          scores, directions):
+        F, IX, IY = 0, 1, 2
+        m = scores.shape[1]
+        n = scores.shape[2]
+        for j0 in range(1, n, _TILE):
+            # Column strips of _TILE cells keep the two active rows of all
+            # three matrices resident in L1 while i sweeps down the strip.
+            jHi = min(n, j0 + _TILE)
+            for i in range(1, m):
+                if band < 0:
+                    jStart, jEnd = j0, jHi
+                else:
+                    jStart = max(j0, i - band)
+                    jEnd = min(jHi, i + band + 1)
+                for j in range(jStart, jEnd):
+                    # Match elements.
+                    prevF = scores[F, i - 1, j - 1]
+                    prevIx = scores[IX, i - 1, j - 1]
+                    prevIy = scores[IY, i - 1, j - 1]
+                    maxScore = max(prevF, prevIx, prevIy)
+                    mask = 0
+                    if prevF == maxScore:
+                        mask |= 1 << F
+                    if prevIx == maxScore:
+                        mask |= 1 << IX
+                    if prevIy == maxScore:
+                        mask |= 1 << IY
+                    if fastBacktrace:
+                        # Only the first tied direction is ever followed.
+                        mask &= -mask
+                    s = match if first[i - 1] == second[j - 1] else mismatch
+                    scores[F, i, j] = maxScore + s
+                    directions[F, i, j] = mask
+
+                    # Gap on first sequence.
+                    if i == m - 1:
+                        prevF = scores[F, i, j - 1]
+                        prevIx = scores[IX, i, j - 1]
+                        prevIy = scores[IY, i, j - 1]
+                        extension = 0
+                    else:
+                        prevF = scores[F, i, j - 1] + gapStart
+                        prevIx = scores[IX, i, j - 1]
+                        prevIy = scores[IY, i, j - 1] + gapStart
+                        extension = gapExtension
+                    maxScore = max(prevF, prevIx, prevIy)
+                    mask = 0
+                    if prevF == maxScore:
+                        mask |= 1 << F
+                    if prevIx == maxScore:
+                        mask |= 1 << IX
+                    if prevIy == maxScore:
+                        mask |= 1 << IY
+                    if fastBacktrace:
+                        mask &= -mask
+                    scores[IX, i, j] = maxScore + extension
+                    directions[IX, i, j] = mask
+
+                    # Gap on second sequence.
+                    if j == n - 1:
+                        prevF = scores[F, i - 1, j]
+                        prevIx = scores[IX, i - 1, j]
+                        prevIy = scores[IY, i - 1, j]
+                        extension = 0
+                    else:
+                        prevF = scores[F, i - 1, j] + gapStart
+                        prevIx = scores[IX, i - 1, j] + gapStart
+                        prevIy = scores[IY, i - 1, j]
+                        extension = gapExtension
+                    maxScore = max(prevF, prevIx, prevIy)
+                    mask = 0
+                    if prevF == maxScore:
+                        mask |= 1 << F
+                    if prevIx == maxScore:
+                        mask |= 1 << IX
+                    if prevIy == maxScore:
+                        mask |= 1 << IY
+                    if fastBacktrace:
+                        mask &= -mask
+                    scores[IY, i, j] = maxScore + extension
+                    directions[IY, i, j] = mask
+
+    @numba.njit(cache=True)
+    def _fillStrictGlobalMatrix(first, second, match, mismatch,
+                                gapScore, band, scores):
+        F = 0
+        m = scores.shape[1]
+        n = scores.shape[2]
+        for j0 in range(1, n, _TILE):
+            # Column strips of _TILE cells keep the two active rows of all
+            # three matrices resident in L1 while i sweeps down the strip.
+            jHi = min(n, j0 + _TILE)
+            for i in range(1, m):
+                if band < 0:
+                    jStart, jEnd = j0, jHi
+                else:
+                    jStart = max(j0, i - band)
+                    jEnd = min(jHi, i + band + 1)
+                for j in range(jStart, jEnd):
+                    # Match elements.
+                    s = match if first[i - 1] == second[j - 1] else mismatch
+                    ab = scores[F, i - 1, j - 1] + s
+
+                    # Gap on first sequence.
+                    ga = scores[F, i, j - 1] + gapScore
+
+                    # Gap on second sequence.
+                    gb = scores[F, i - 1, j] + gapScore
+
+                    scores[F, i, j] = max(ab, ga, gb)
+
+    @numba.njit(cache=True)
+    def _scoreStrictGlobalMatrix(first, second, match, mismatch, gapScore):
+        m = first.shape[0] + 1
+        n = second.shape[0] + 1
+        previous = np.zeros(n, dtype=np.int32)
+        current = np.zeros(n, dtype=np.int32)
+        for j in range(1, n):
+            previous[j] = previous[j - 1] + gapScore
+        for i in range(1, m):
+            current[0] = previous[0] + gapScore
+            for j in range(1, n):
+                s = match if first[i - 1] == second[j - 1] else mismatch
+                current[j] = max(previous[j - 1] + s,
+                                 previous[j] + gapScore,
+                                 current[j - 1] + gapScore)
+            previous, current = current, previous
+        return previous[n - 1]
+
+    @numba.njit(cache=True, parallel=True)
+    def _scoreBatchGlobalMatrix(first, seconds, lengths,
+                                match, mismatch, gapStart, gapExtension):
+        count = seconds.shape[0]
+        out = np.zeros(count, dtype=np.int64)
+        m = first.shape[0] + 1
+        for index in numba.prange(count):
+            n = lengths[index] + 1
+            fPrevious = np.zeros(n, dtype=np.int32)
+            ixPrevious = np.zeros(n, dtype=np.int32)
+            iyPrevious = np.zeros(n, dtype=np.int32)
+            fCurrent = np.zeros(n, dtype=np.int32)
+            ixCurrent = np.zeros(n, dtype=np.int32)
+            iyCurrent = np.zeros(n, dtype=np.int32)
+            for i in range(1, m):
+                for j in range(1, n):
+                    # Match elements.
+                    maxScore = max(fPrevious[j - 1], ixPrevious[j - 1],
+                                   iyPrevious[j - 1])
+                    s = match if first[i - 1] == seconds[index, j - 1] \
+                        else mismatch
+                    fCurrent[j] = maxScore + s
+
+                    # Gap on first sequence.
+                    if i == m - 1:
+                        ixCurrent[j] = max(fCurrent[j - 1], ixCurrent[j - 1],
+                                           iyCurrent[j - 1])
+                    else:
+                        ixCurrent[j] = max(fCurrent[j - 1] + gapStart,
+                                           ixCurrent[j - 1],
+                                           iyCurrent[j - 1] + gapStart) \
+                            + gapExtension
+
+                    # Gap on second sequence.
+                    if j == n - 1:
+                        iyCurrent[j] = max(fPrevious[j], ixPrevious[j],
+                                           iyPrevious[j])
+                    else:
+                        iyCurrent[j] = max(fPrevious[j] + gapStart,
+                                           ixPrevious[j] + gapStart,
+                                           iyPrevious[j]) + gapExtension
+                fPrevious, fCurrent = fCurrent, fPrevious
+                ixPrevious, ixCurrent = ixCurrent, ixPrevious
+                iyPrevious, iyCurrent = iyCurrent, iyPrevious
+            out[index] = max(fPrevious[n - 1], ixPrevious[n - 1],
+                             iyPrevious[n - 1])
+        return out
+
+    @numba.njit(cache=True, parallel=True)
+    def _scoreBatchStrictGlobalMatrix(first, seconds, lengths,
+                                      match, mismatch, gapScore):
+        count = seconds.shape[0]
+        out = np.zeros(count, dtype=np.int64)
+        m = first.shape[0] + 1
+        for index in numba.prange(count):
+            n = lengths[index] + 1
+            previous = np.zeros(n, dtype=np.int32)
+            current = np.zeros(n, dtype=np.int32)
+            for j in range(1, n):
+                previous[j] = previous[j - 1] + gapScore
+            for i in range(1, m):
+                current[0] = previous[0] + gapScore
+                for j in range(1, n):
+                    s = match if first[i - 1] == seconds[index, j - 1] \
+                        else mismatch
+                    current[j] = max(previous[j - 1] + s,
+                                     previous[j] + gapScore,
+                                     current[j - 1] + gapScore)
+                previous, current = current, previous
+            out[index] = previous[n - 1]
+        return out
+
+    @numba.njit(cache=True, parallel=True)
+    def _scoreBatchLocalMatrix(first, seconds, lengths,
+                               match, mismatch, gapStart, gapExtension):
+        count = seconds.shape[0]
+        out = np.zeros(count, dtype=np.int64)
+        m = first.shape[0] + 1
+        minScore = np.int32(np.iinfo(np.int32).min // 2)
+        for index in numba.prange(count):
+            n = lengths[index] + 1
+            fPrevious = np.full(n, minScore, dtype=np.int32)
+            ixPrevious = np.zeros(n, dtype=np.int32)
+            iyPrevious = np.full(n, minScore, dtype=np.int32)
+            fCurrent = np.full(n, minScore, dtype=np.int32)
+            ixCurrent = np.full(n, minScore, dtype=np.int32)
+            iyCurrent = np.zeros(n, dtype=np.int32)
+            fPrevious[0] = 0
+            ixPrevious[0] = minScore
+            best = 0
+            for i in range(1, m):
+                fCurrent[0] = minScore
+                ixCurrent[0] = minScore
+                iyCurrent[0] = 0
+                for j in range(1, n):
+                    # Match elements.
+                    maxScore = max(fPrevious[j - 1], ixPrevious[j - 1],
+                                   iyPrevious[j - 1])
+                    s = match if first[i - 1] == seconds[index, j - 1] \
+                        else mismatch
+                    # Clamp with a compare instead of max(0, ...); LLVM turns
+                    # the branch into a packed signed max against zero.
+                    score = maxScore + s
+                    if score < 0:
+                        score = 0
+                    fCurrent[j] = score
+
+                    # Gap on sequenceA.
+                    score = max(fCurrent[j - 1] + gapStart,
+                                ixCurrent[j - 1],
+                                iyCurrent[j - 1] + gapStart) + gapExtension
+                    if score < 0:
+                        score = 0
+                    ixCurrent[j] = score
+
+                    # Gap on sequenceB.
+                    score = max(fPrevious[j] + gapStart,
+                                ixPrevious[j] + gapStart,
+                                iyPrevious[j]) + gapExtension
+                    if score < 0:
+                        score = 0
+                    iyCurrent[j] = score
+
+                    best = max(best, fCurrent[j], ixCurrent[j], iyCurrent[j])
+                fPrevious, fCurrent = fCurrent, fPrevious
+                ixPrevious, ixCurrent = ixCurrent, ixPrevious
+                iyPrevious, iyCurrent = iyCurrent, iyPrevious
+            out[index] = best
+        return out
+
+    @numba.njit(cache=True)
+    def _fillLocalMatrix(first, second, match, mismatch,
+                         gapStart, gapExtension, band, scores, directions):
+        F, IX, IY = 0, 1, 2
+        m = scores.shape[1]
+        n = scores.shape[2]
+        for j0 in range(1, n, _TILE):
+            # Column strips of _TILE cells keep the two active rows of all
+            # three matrices resident in L1 while i sweeps down the strip.
+            jHi = min(n, j0 + _TILE)
+            for i in range(1, m):
+                if band < 0:
+                    jStart, jEnd = j0, jHi
+                else:
+                    jStart = max(j0, i - band)
+                    jEnd = min(jHi, i + band + 1)
+                for j in range(jStart, jEnd):
+                    # Match elements.
+                    prevF = scores[F, i - 1, j - 1]
+                    prevIx = scores[IX, i - 1, j - 1]
+                    prevIy = scores[IY, i - 1, j - 1]
+                    maxScore = max(prevF, prevIx, prevIy)
+                    mask = 0
+                    if prevF == maxScore:
+                        mask |= 1 << F
+                    if prevIx == maxScore:
+                        mask |= 1 << IX
+                    if prevIy == maxScore:
+                        mask |= 1 << IY
+                    if maxScore <= 0:
+                        # Keep only the first direction of the tie.
+                        mask &= -mask
+                    s = match if first[i - 1] == second[j - 1] else mismatch
+                    # Clamp with a compare instead of max(0, ...); LLVM turns
+                    # the branch into a packed signed max against zero.
+                    score = maxScore + s
+                    if score < 0:
+                        score = 0
+                    scores[F, i, j] = score
+                    directions[F, i, j] = mask
+
+                    # Gap on sequenceA.
+                    prevF = scores[F, i, j - 1] + gapStart
+                    prevIx = scores[IX, i, j - 1]
+                    prevIy = scores[IY, i, j - 1] + gapStart
+                    maxScore = max(prevF, prevIx, prevIy)
+                    mask = 0
+                    if prevF == maxScore:
+                        mask |= 1 << F
+                    if prevIx == maxScore:
+                        mask |= 1 << IX
+                    if prevIy == maxScore:
+                        mask |= 1 << IY
+                    score = maxScore + gapExtension
+                    if score < 0:
+                        score = 0
+                    scores[IX, i, j] = score
+                    directions[IX, i, j] = mask
+
+                    # Gap on sequenceB.
+                    prevF = scores[F, i - 1, j] + gapStart
+                    prevIx = scores[IX, i - 1, j] + gapStart
+                    prevIy = scores[IY, i - 1, j]
+                    maxScore = max(prevF, prevIx, prevIy)
+                    mask = 0
+                    if prevF == maxScore:
+                        mask |= 1 << F
+                    if prevIx == maxScore:
+                        mask |= 1 << IX
+                    if prevIy == maxScore:
+                        mask |= 1 << IY
+                    score = maxScore + gapExtension
+                    if score < 0:
+                        score = 0
+                    scores[IY, i, j] = score
+                    directions[IY, i, j] = mask
+
+
+# CUDA batch kernels. One GPU thread runs the rolling-row recurrence for one
+# pair, so the batch dimension maps onto the grid; each kernel mirrors the
+# matching numba batch kernel above. Rolling rows live in a per-thread slice
+# of a global-memory workspace.
+_CUDA_SOURCE = r'''
+#define MIN_SCORE ((-2147483647 - 1) / 2)
+
+extern "C" __global__
+void scoreBatchGlobal(const int* first, const int* seconds,
+                      const long long* lengths, const int count,
+                      const int m, const int width,
+                      const int match, const int mismatch,
+                      const int gapStart, const int gapExtension,
+                      int* work, long long* out)
+{
+    int index = blockIdx.x * blockDim.x + threadIdx.x;
+    if (index >= count) {
+        return;
+    }
+    int n = (int) lengths[index] + 1;
+    const int* second = seconds + (long long) index * (width - 1);
+    int* fPrevious = work + (long long) index * 6 * width;
+    int* ixPrevious = fPrevious + width;
+    int* iyPrevious = ixPrevious + width;
+    int* fCurrent = iyPrevious + width;
+    int* ixCurrent = fCurrent + width;
+    int* iyCurrent = ixCurrent + width;
+    int* swap;
+    for (int j = 0; j < n; j++) {
+        fPrevious[j] = 0; ixPrevious[j] = 0; iyPrevious[j] = 0;
+        fCurrent[j] = 0; ixCurrent[j] = 0; iyCurrent[j] = 0;
+    }
+    for (int i = 1; i < m; i++) {
+        for (int j = 1; j < n; j++) {
+            /* Match elements. */
+            int maxScore = max(fPrevious[j - 1],
+                               max(ixPrevious[j - 1], iyPrevious[j - 1]));
+            int s = first[i - 1] == second[j - 1] ? match : mismatch;
+            fCurrent[j] = maxScore + s;
+
+            /* Gap on first sequence. */
+            if (i == m - 1) {
+                ixCurrent[j] = max(fCurrent[j - 1],
+                                   max(ixCurrent[j - 1], iyCurrent[j - 1]));
+            } else {
+                ixCurrent[j] = max(fCurrent[j - 1] + gapStart,
+                                   max(ixCurrent[j - 1],
+                                       iyCurrent[j - 1] + gapStart))
+                    + gapExtension;
+            }
+
+            /* Gap on second sequence. */
+            if (j == n - 1) {
+                iyCurrent[j] = max(fPrevious[j],
+                                   max(ixPrevious[j], iyPrevious[j]));
+            } else {
+                iyCurrent[j] = max(fPrevious[j] + gapStart,
+                                   max(ixPrevious[j] + gapStart,
+                                       iyPrevious[j]))
+                    + gapExtension;
+            }
+        }
+        swap = fPrevious; fPrevious = fCurrent; fCurrent = swap;
+        swap = ixPrevious; ixPrevious = ixCurrent; ixCurrent = swap;
+        swap = iyPrevious; iyPrevious = iyCurrent; iyCurrent = swap;
+    }
+    out[index] = max(fPrevious[n - 1],
+                     max(ixPrevious[n - 1], iyPrevious[n - 1]));
+}
+
+extern "C" __global__
+void scoreBatchStrictGlobal(const int* first, const int* seconds,
+                            const long long* lengths, const int count,
+                            const int m, const int width,
+                            const int match, const int mismatch,
+                            const int gapScore,
+                            int* work, long long* out)
+{
+    int index = blockIdx.x * blockDim.x + threadIdx.x;
+    if (index >= count) {
+        return;
+    }
+    int n = (int) lengths[index] + 1;
+    const int* second = seconds + (long long) index * (width - 1);
+    int* previous = work + (long long) index * 6 * width;
+    int* current = previous + width;
+    int* swap;
+    previous[0] = 0;
+    for (int j = 1; j < n; j++) {
+        previous[j] = previous[j - 1] + gapScore;
+    }
+    for (int i = 1; i < m; i++) {
+        current[0] = previous[0] + gapScore;
+        for (int j = 1; j < n; j++) {
+            int s = first[i - 1] == second[j - 1] ? match : mismatch;
+            current[j] = max(previous[j - 1] + s,
+                             max(previous[j] + gapScore,
+                                 current[j - 1] + gapScore));
+        }
+        swap = previous; previous = current; current = swap;
+    }
+    out[index] = previous[n - 1];
+}
+
+extern "C" __global__
+void scoreBatchLocal(const int* first, const int* seconds,
+                     const long long* lengths, const int count,
+                     const int m, const int width,
+                     const int match, const int mismatch,
+                     const int gapStart, const int gapExtension,
+                     int* work, long long* out)
+{
+    int index = blockIdx.x * blockDim.x + threadIdx.x;
+    if (index >= count) {
+        return;
+    }
+    int n = (int) lengths[index] + 1;
+    const int* second = seconds + (long long) index * (width - 1);
+    int* fPrevious = work + (long long) index * 6 * width;
+    int* ixPrevious = fPrevious + width;
+    int* iyPrevious = ixPrevious + width;
+    int* fCurrent = iyPrevious + width;
+    int* ixCurrent = fCurrent + width;
+    int* iyCurrent = ixCurrent + width;
+    int* swap;
+    for (int j = 0; j < n; j++) {
+        fPrevious[j] = MIN_SCORE;
+        ixPrevious[j] = 0;
+        iyPrevious[j] = MIN_SCORE;
+        fCurrent[j] = MIN_SCORE;
+        ixCurrent[j] = MIN_SCORE;
+        iyCurrent[j] = 0;
+    }
+    fPrevious[0] = 0;
+    ixPrevious[0] = MIN_SCORE;
+    long long best = 0;
+    for (int i = 1; i < m; i++) {
+        fCurrent[0] = MIN_SCORE;
+        ixCurrent[0] = MIN_SCORE;
+        iyCurrent[0] = 0;
+        for (int j = 1; j < n; j++) {
+            /* Match elements. */
+            int maxScore = max(fPrevious[j - 1],
+                               max(ixPrevious[j - 1], iyPrevious[j - 1]));
+            int s = first[i - 1] == second[j - 1] ? match : mismatch;
+            fCurrent[j] = max(0, maxScore + s);
+
+            /* Gap on sequenceA. */
+            ixCurrent[j] = max(0, max(fCurrent[j - 1] + gapStart,
+                                      max(ixCurrent[j - 1],
+                                          iyCurrent[j - 1] + gapStart))
+                               + gapExtension);
+
+            /* Gap on sequenceB. */
+            iyCurrent[j] = max(0, max(fPrevious[j] + gapStart,
+                                      max(ixPrevious[j] + gapStart,
+                                          iyPrevious[j]))
+                               + gapExtension);
+
+            best = max(best, (long long) max(fCurrent[j],
+                                             max(ixCurrent[j],
+                                                 iyCurrent[j])));
+        }
+        swap = fPrevious; fPrevious = fCurrent; fCurrent = swap;
+        swap = ixPrevious; ixPrevious = ixCurrent; ixCurrent = swap;
+        swap = iyPrevious; iyPrevious = iyCurrent; iyCurrent = swap;
+    }
+    out[index] = best;
+}
+'''
+
+_cudaModule = None
+
+
+def _cudaScoreBatch(kernelName, first, seconds, lengths, params):
+    global _cudaModule
+    try:
+        if _cudaModule is None:
+            _cudaModule = cupy.RawModule(code=_CUDA_SOURCE)
+        kernel = _cudaModule.get_function(kernelName)
+        count = seconds.shape[0]
+        width = seconds.shape[1] + 1
+        work = cupy.empty(count * 6 * width, dtype=cupy.int32)
+        out = cupy.zeros(count, dtype=cupy.int64)
+        threads = 128
+        blocks = (count + threads - 1) // threads
+        kernel((blocks,), (threads,),
+               (cupy.asarray(first), cupy.asarray(seconds),
+                cupy.asarray(lengths), np.int32(count),
+                np.int32(first.shape[0] + 1), np.int32(width))
+               + tuple(np.int32(param) for param in params)
+               + (work, out))
+        return cupy.asnumpy(out)
+    except Exception:
+        # No usable CUDA device or the kernel failed to build; callers fall
+        # back to the CPU paths.
+        return None
+
+
+# Worker-process state for alignMany. The pool initializer installs the
+# aligner once per worker, so it is pickled once instead of once per pair.
+_workerAligner = None
+_workerBacktrace = False
+
+
+def _initAlignWorker(aligner, backtrace):
+    global _workerAligner, _workerBacktrace
+    _workerAligner = aligner
+    _workerBacktrace = backtrace
+
+
+def _alignWorker(pair):
+    first, second = pair
+    return _workerAligner.align(first, second, _workerBacktrace)
+
 
 class SequenceAligner(object):
     __metaclass__ = ABCMeta
 
-    def __init__(self, scoring, gapScore, gapExtensionScore):
+    def __init__(self, scoring, gapScore, gapExtensionScore, band=None,
+                 backend=None):
         self.scoring = scoring
         self.gapScore = gapScore
         self.gapExtensionScore = gapExtensionScore
+        # When band is an int, only cells with |i - j| <= band are filled,
+        # dropping complexity from O(mn) to O(m * band) for similar sequences.
+        self.band = band
+        # backend='parasail' delegates SimpleScoring alignments to parasail's
+        # striped SIMD kernels when the library is installed. parasail reports
+        # a single optimal alignment, so tied alternatives are not enumerated.
+        self.backend = backend
 
     def align(self, first, second, backtrace=False):
+        self._checkBand(first, second)
+        if self.backend == 'parasail':
+            result = self._alignParasail(first, second, backtrace)
+            if result is not None:
+                return result
         f = self.computeAlignmentMatrix(first, second)
         score = self.bestScore(f)
         if backtrace:
@@ -244,13 +1018,260 @@ class SequenceAligner(object):
         else:
             return score
 
+    def alignBatch(self, first, seconds):
+        # Scores first against every sequence in seconds and returns the list
+        # of scores. With a SimpleScoring the whole batch runs in one kernel,
+        # on the GPU when cupy is installed and finds a device, else in the
+        # numba parallel kernel; otherwise the pairs are aligned one by one.
+        # Materialized first so that a generator argument survives the
+        # packing pass and is still available to the pairwise fallback.
+        seconds = list(seconds)
+        if not seconds:
+            return []
+        if (cupy is not None or numba is not None) \
+                and self._integralScoring() and self.band is None:
+            a = _encodedElements(first)
+            packed, lengths = _packEncodedElements(seconds)
+            if a is not None and packed is not None:
+                scores = None
+                if cupy is not None:
+                    scores = self._cudaBatchScores(a, packed, lengths)
+                if scores is None and numba is not None:
+                    scores = self._batchScores(a, packed, lengths)
+                if scores is not None:
+                    return [int(score) for score in scores]
+        return [self.align(first, second) for second in seconds]
+
+    def alignMany(self, pairs, workers=None, backtrace=False):
+        # Aligns every (first, second) pair in a pool of worker processes
+        # and returns the align() results in order. The pairs are
+        # independent, so one-against-many and all-against-all workloads
+        # scale with the number of cores; workers defaults to the core
+        # count, as in multiprocessing.Pool. Workers are spawned rather
+        # than forked: forking a parent whose numba threading layer has
+        # already started can deadlock the parent at interpreter exit.
+        pairs = list(pairs)
+        if not pairs:
+            return []
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(workers, _initAlignWorker,
+                          (self, backtrace)) as pool:
+            return pool.map(_alignWorker, pairs)
+
+    def _batchScores(self, first, seconds, lengths):
+        return None
+
+    def _cudaBatchScores(self, first, seconds, lengths):
+        return None
+
+    def _integralScoring(self):
+        # The batch kernels accumulate in hard-coded integer buffers, and
+        # integer matrices would truncate fractional scores, so both are only
+        # safe when every scoring constant is an int. SoftScoring and other
+        # custom scorings may return floats.
+        return (isinstance(self.scoring, SimpleScoring)
+                and all(isinstance(score, int) for score in (
+                    self.scoring.matchScore, self.scoring.mismatchScore,
+                    self.scoring.gapStartScore,
+                    self.scoring.gapExtensionScore,
+                    self.gapScore, self.gapExtensionScore)))
+
+    def _scoreDtype(self, first, second):
+        # Scorings that can produce non-integral scores get an exact float64
+        # buffer. Integral ones use int32, narrowed to int16 when a
+        # conservative bound proves no score can leave the int16 range:
+        # every alignment path takes at most m + n steps, each contributing
+        # one scoring constant. Banded matrices stay at int32 because the
+        # out-of-band sentinel sits far below zero and gap chains walk
+        # further down from it.
+        if not self._integralScoring():
+            return np.float64
+        if self.band is None:
+            bound = max(abs(self.scoring.matchScore),
+                        abs(self.scoring.mismatchScore),
+                        abs(self.scoring.gapStartScore),
+                        abs(self.scoring.gapExtensionScore),
+                        abs(self.gapScore),
+                        abs(self.gapExtensionScore))
+            if bound * (len(first) + len(second)) < 2 ** 15:
+                return np.int16
+        return AlignmentMatrix.SCORE_DTYPE
+
     def emptyAlignment(self, first, second):
         # Pre-allocate sequences.
         return SequenceAlignment(
             EncodedSequence(len(first) + len(second), id=first.id),
             EncodedSequence(len(first) + len(second), id=second.id),
+            dtype=None if self._integralScoring() else np.float64,
         )
 
+    def _substitutionScores(self, first, second):
+        # Hoist the O(mn) per-cell scoring calls into one table. SimpleScoring
+        # only depends on element equality, so its table costs no calls at
+        # all; custom scorings are invoked once per pair instead of once per
+        # visit to a DP cell.
+        if isinstance(self.scoring, SimpleScoring):
+            match = self.scoring.matchScore
+            mismatch = self.scoring.mismatchScore
+            return [[match if a == b else mismatch for b in second]
+                    for a in first]
+        else:
+            return [[self.scoring(a, b) for b in second] for a in first]
+
+    def _gapScores(self, sequence):
+        # Likewise for the per-element gap scores, which SimpleScoring
+        # returns as constants.
+        if isinstance(self.scoring, SimpleScoring):
+            starts = [self.scoring.gapStartScore] * len(sequence)
+            extensions = [self.scoring.gapExtensionScore] * len(sequence)
+        else:
+            starts = [self.scoring.gapStart(e) for e in sequence]
+            extensions = [self.scoring.gapExtension(e) for e in sequence]
+        return starts, extensions
+
+    def _checkBand(self, first, second):
+        # A band narrower than the length difference leaves the end of the
+        # longer sequence unreachable, so the fill would silently return the
+        # out-of-band sentinel and no alignments.
+        if self.band is not None \
+                and self.band < abs(len(first) - len(second)):
+            raise ValueError(
+                'band %d is narrower than the sequence length difference %d'
+                % (self.band, abs(len(first) - len(second))))
+
+    def _columnRange(self, i, n):
+        if self.band is None:
+            return range(1, n)
+        else:
+            return range(max(1, i - self.band), min(n, i + self.band + 1))
+
+    # parasail backend --------------------------------------------------------
+
+    # 'nw', 'sg', or 'sw'; None disables the backend for a subclass.
+    _parasailAlgorithm = None
+    # Whether end-gap columns are free and must be dropped from the result,
+    # matching this aligner's backtrace conventions.
+    _parasailTrimEndGaps = False
+    # Lowercase is excluded because parasail looks up matrix entries
+    # case-insensitively.
+    _PARASAIL_CHARACTERS = [chr(c) for c in range(33, 127)
+                            if not chr(c).islower()]
+
+    def _alignParasail(self, first, second, backtrace):
+        # Returns None whenever parasail cannot reproduce the request, in
+        # which case align() falls back to the native implementation.
+        if parasail is None or self._parasailAlgorithm is None:
+            return None
+        if self.band is not None:
+            return None
+        if not isinstance(self.scoring, SimpleScoring):
+            return None
+        penalties = self._parasailPenalties()
+        if penalties is None:
+            return None
+        strings = self._parasailStrings(first, second)
+        if strings is None:
+            return None
+        firstString, secondString = strings
+        if not firstString or not secondString:
+            return None
+        matrix = parasail.matrix_create(
+            ''.join(sorted(set(firstString + secondString))),
+            self.scoring.matchScore, self.scoring.mismatchScore)
+        openPenalty, extendPenalty = penalties
+        if not self._parasailEquivalent(firstString, secondString,
+                                        openPenalty, extendPenalty, matrix):
+            return None
+        # Score-only goes through the scan kernels: parasail's striped
+        # 16-bit score-only variants occasionally misreport nw scores.
+        function = getattr(parasail, '%s_trace_striped_16'
+                           % self._parasailAlgorithm) if backtrace \
+            else getattr(parasail, '%s_scan_16' % self._parasailAlgorithm)
+        result = function(firstString, secondString,
+                          openPenalty, extendPenalty, matrix)
+        if result.saturated:
+            return None
+        score = int(result.score)
+        if backtrace:
+            alignment = self._parasailAlignment(first, second, result,
+                                                penalties)
+            return score, [alignment]
+        else:
+            return score
+
+    def _parasailEquivalent(self, firstString, secondString, openPenalty,
+                            extendPenalty, matrix):
+        # Hook for subclasses whose recurrence has no exact parasail mode.
+        return True
+
+    def _parasailPenalties(self):
+        # parasail charges openPenalty for the first element of a gap and
+        # extendPenalty for each further one, and requires
+        # openPenalty >= extendPenalty >= 0.
+        if not isinstance(self.scoring, SimpleScoring):
+            return None
+        openPenalty = -(self.scoring.gapStartScore
+                        + self.scoring.gapExtensionScore)
+        extendPenalty = -self.scoring.gapExtensionScore
+        if openPenalty < extendPenalty or extendPenalty < 0:
+            return None
+        return openPenalty, extendPenalty
+
+    def _parasailStrings(self, first, second):
+        firstElements = [first[i] for i in range(len(first))]
+        secondElements = [second[i] for i in range(len(second))]
+        characters = {}
+        for element in firstElements + secondElements:
+            if element not in characters:
+                if len(characters) == len(self._PARASAIL_CHARACTERS):
+                    return None
+                characters[element] = \
+                    self._PARASAIL_CHARACTERS[len(characters)]
+        return (''.join(characters[e] for e in firstElements),
+                ''.join(characters[e] for e in secondElements))
+
+    def _parasailAlignment(self, first, second, result, penalties):
+        openPenalty, extendPenalty = penalties
+        cigar = result.cigar
+        columns = []
+        i = cigar.beg_query
+        j = cigar.beg_ref
+        alignment = self.emptyAlignment(first, second)
+        for value in cigar.seq:
+            length = int(value) >> 4
+            operation = 'MIDNSHP=XB'[int(value) & 0xF]
+            if operation in ('=', 'X', 'M'):
+                for _ in range(length):
+                    columns.append((first[i], second[j],
+                                    self.scoring(first[i], second[j])))
+                    i += 1
+                    j += 1
+            elif operation == 'I':
+                # Consumes the first sequence: gap on the second one.
+                for k in range(length):
+                    columns.append((first[i], alignment.gap,
+                                    -openPenalty if k == 0
+                                    else -extendPenalty))
+                    i += 1
+            elif operation == 'D':
+                # Consumes the second sequence: gap on the first one.
+                for k in range(length):
+                    columns.append((alignment.gap, second[j],
+                                    -openPenalty if k == 0
+                                    else -extendPenalty))
+                    j += 1
+        if self._parasailTrimEndGaps:
+            while columns and alignment.gap in (columns[0][0], columns[0][1]):
+                columns.pop(0)
+            while columns and alignment.gap in (columns[-1][0],
+                                                columns[-1][1]):
+                columns.pop()
+        # Push backwards and snapshot through reversed(), as the native
+        # backtraces do, so the pre-allocated buffers are trimmed.
+        for a, b, s in reversed(columns):
+            alignment.push(a, b, s)
+        return alignment.reversed()
+
     @abstractmethod
     def computeAlignmentMatrix(self, first, second):
         return AlignmentMatrix()
@@ -265,33 +1286,121 @@ class SequenceAligner(object):
 
 
 class GlobalSequenceAligner(SequenceAligner):
+    # Free end gaps on both sequences: parasail's semi-global alignment.
+    _parasailAlgorithm = 'sg'
+    _parasailTrimEndGaps = True
 
-    def __init__(self, scoring, fastBacktrace=False):
-        super(GlobalSequenceAligner, self).__init__(scoring, 0, 0)
+    def __init__(self, scoring, fastBacktrace=False, band=None, backend=None):
+        super(GlobalSequenceAligner, self).__init__(scoring, 0, 0, band,
+                                                    backend)
         self._fastBacktrace = fastBacktrace
 
-    def computeAlignmentMatrix(self, first, second):
+    def _batchScores(self, first, seconds, lengths):
+        return _scoreBatchGlobalMatrix(
+            first, seconds, lengths,
+            self.scoring.matchScore, self.scoring.mismatchScore,
+            self.scoring.gapStartScore, self.scoring.gapExtensionScore)
+
+    def _cudaBatchScores(self, first, seconds, lengths):
+        return _cudaScoreBatch(
+            'scoreBatchGlobal', first, seconds, lengths,
+            (self.scoring.matchScore, self.scoring.mismatchScore,
+             self.scoring.gapStartScore, self.scoring.gapExtensionScore))
+
+    def _parasailEquivalent(self, firstString, secondString, openPenalty,
+                            extendPenalty, matrix):
+        # This aligner lets trailing gaps on both sequences chain through the
+        # matrix corner, which sits strictly between parasail's sg (free end
+        # gaps on one side per end) and sw (free everywhere) modes. The
+        # native score is bracketed by the two, so the sg result is only
+        # trusted when the bounds agree; otherwise fall back.
+        lower = parasail.sg_scan_16(firstString, secondString,
+                                    openPenalty, extendPenalty, matrix)
+        upper = parasail.sw_scan_16(firstString, secondString,
+                                    openPenalty, extendPenalty, matrix)
+        return (not lower.saturated and not upper.saturated
+                and lower.score == upper.score)
+
+    def align(self, first, second, backtrace=False):
+        if not backtrace and self.band is None and self.backend is None:
+            # Only the last row decides the score, so two rolling rows
+            # replace the full O(mn) cube.
+            return self.computeScoreOnly(first, second)
+        return super(GlobalSequenceAligner, self).align(
+            first, second, backtrace)
+
+    def computeScoreOnly(self, first, second):
+        if numba is not None and self._integralScoring():
+            a = _encodedElements(first)
+            packed, lengths = _packEncodedElements([second])
+            if a is not None and packed is not None:
+                return int(self._batchScores(a, packed, lengths)[0])
+        f = self.computeAlignmentMatrix(first, second, rolling=True)
+        return self.bestScore(f)
+
+    def computeAlignmentMatrix(self, first, second, rolling=False):
         m = len(first) + 1
         n = len(second) + 1
-        f = AlignmentMatrix((m,n))
+        f = AlignmentMatrix((m,n), rolling, self._scoreDtype(first, second))
+        if self.band is not None:
+            # Out-of-band cells keep a sentinel so in-band maxima are never
+            # beaten by unreachable cells; the borders stay at zero.
+            f.scores[:, 1:, 1:] = f.minScore()
+        if not rolling and isinstance(self.scoring, SimpleScoring):
+            a = _encodedElements(first)
+            b = _encodedElements(second)
+            if a is not None and b is not None:
+                # The Cython kernel is compiled for int32 buffers only.
+                if _aligner is not None and self.band is None \
+                        and f.scores.dtype == np.int32:
+                    _aligner.fillGlobalMatrix(
+                        a, b,
+                        self.scoring.matchScore, self.scoring.mismatchScore,
+                        self.scoring.gapStartScore,
+                        self.scoring.gapExtensionScore,
+                        self._fastBacktrace,
+                        f.scores, f.directions)
+                    return f
+                if numba is not None:
+                    _fillGlobalMatrix(
+                        a, b,
+                        self.scoring.matchScore, self.scoring.mismatchScore,
+                        self.scoring.gapStartScore,
+                        self.scoring.gapExtensionScore,
+                        -1 if self.band is None else self.band,
+                        self._fastBacktrace,
+                        f.scores, f.directions)
+                    return f
+                if self.band is None:
+                    _fillGlobalMatrixWavefront(
+                        a, b,
+                        self.scoring.matchScore, self.scoring.mismatchScore,
+                        self.scoring.gapStartScore,
+                        self.scoring.gapExtensionScore,
+                        self._fastBacktrace,
+                        f.scores, f.directions)
+                    return f
+        sub = self._substitutionScores(first, second)
+        gapStartA, gapExtensionA = self._gapScores(first)
+        gapStartB, gapExtensionB = self._gapScores(second)
+        fast = self._fastBacktrace
         for i in range(1, m):
-            for j in range(1, n):
+            for j in self._columnRange(i, n):
                 # Match elements.
                 prevF = f.getScore(MatrixType.F ,i - 1, j - 1)
                 prevIx = f.getScore(MatrixType.IX ,i - 1, j - 1)
                 prevIy = f.getScore(MatrixType.IY ,i - 1, j - 1)
                 maxScore = max(prevF, prevIx, prevIy)
-                dirAb = [
-                    dir for
-                    score, dir in [
-                        (prevF, MatrixType.F),
-                        (prevIx, MatrixType.IX),
-                        (prevIy, MatrixType.IY)
-                    ]
-                    if score == maxScore
-                ]
-                f.setScore(MatrixType.F ,i, j, maxScore + self.scoring(first[i - 1], second[j - 1]))
-                f.setDirection(MatrixType.F ,i, j, dirAb)
+                # Branchless tie mask: bit t is set iff MatrixType(t) ties.
+                # Only the first tied direction is kept when the backtrace
+                # follows a single path anyway.
+                mask = ((prevF == maxScore)
+                        | (prevIx == maxScore) << 1
+                        | (prevIy == maxScore) << 2)
+                if fast:
+                    mask &= -mask
+                f.setScore(MatrixType.F ,i, j, maxScore + sub[i - 1][j - 1])
+                f.setDirectionMask(MatrixType.F ,i, j, mask)
 
                 # Gap on first sequence.
                 if i == m - 1:
@@ -299,33 +1408,25 @@ class GlobalSequenceAligner(SequenceAligner):
                     prevIx = f.getScore(MatrixType.IX ,i, j - 1)
                     prevIy = f.getScore(MatrixType.IY ,i, j - 1)
                     maxScore = max(prevF, prevIx, prevIy)
-                    dirGa = [
-                        dir for
-                        score, dir in [
-                            (prevF, MatrixType.F),
-                            (prevIx, MatrixType.IX),
-                            (prevIy, MatrixType.IY)
-                        ]
-                        if score == maxScore
-                    ]
+                    mask = ((prevF == maxScore)
+                            | (prevIx == maxScore) << 1
+                            | (prevIy == maxScore) << 2)
+                    if fast:
+                        mask &= -mask
                     f.setScore(MatrixType.IX ,i, j, maxScore)
-                    f.setDirection(MatrixType.IX ,i, j, dirGa)
+                    f.setDirectionMask(MatrixType.IX ,i, j, mask)
                 else:
-                    prevF = f.getScore(MatrixType.F ,i, j - 1) + self.scoring.gapStart(second[j-1])
+                    prevF = f.getScore(MatrixType.F ,i, j - 1) + gapStartB[j - 1]
                     prevIx = f.getScore(MatrixType.IX ,i, j - 1)
-                    prevIy = f.getScore(MatrixType.IY ,i, j - 1) + self.scoring.gapStart(second[j-1])
+                    prevIy = f.getScore(MatrixType.IY ,i, j - 1) + gapStartB[j - 1]
                     maxScore = max(prevF, prevIx, prevIy)
-                    dirGa = [
-                        dir for
-                        score, dir in [
-                            (prevF, MatrixType.F),
-                            (prevIx, MatrixType.IX),
-                            (prevIy, MatrixType.IY)
-                        ]
-                        if score == maxScore
-                    ]
-                    f.setScore(MatrixType.IX ,i, j, maxScore + self.scoring.gapExtension(second[j-1]))
-                    f.setDirection(MatrixType.IX ,i, j, dirGa)
+                    mask = ((prevF == maxScore)
+                            | (prevIx == maxScore) << 1
+                            | (prevIy == maxScore) << 2)
+                    if fast:
+                        mask &= -mask
+                    f.setScore(MatrixType.IX ,i, j, maxScore + gapExtensionB[j - 1])
+                    f.setDirectionMask(MatrixType.IX ,i, j, mask)
 
                 # Gap on second sequence.
                 if j == n - 1:
@@ -333,33 +1434,25 @@ class GlobalSequenceAligner(SequenceAligner):
                     prevIx = f.getScore(MatrixType.IX ,i - 1, j)
                     prevIy = f.getScore(MatrixType.IY ,i - 1, j)
                     maxScore = max(prevF, prevIx, prevIy)
-                    dirGb = [
-                        dir for
-                        score, dir in [
-                            (prevF, MatrixType.F),
-                            (prevIx, MatrixType.IX),
-                            (prevIy, MatrixType.IY)
-                        ]
-                        if score == maxScore
-                    ]
+                    mask = ((prevF == maxScore)
+                            | (prevIx == maxScore) << 1
+                            | (prevIy == maxScore) << 2)
+                    if fast:
+                        mask &= -mask
                     f.setScore(MatrixType.IY ,i,j, maxScore)
-                    f.setDirection(MatrixType.IY ,i, j, dirGb)
+                    f.setDirectionMask(MatrixType.IY ,i, j, mask)
                 else:
-                    prevF = f.getScore(MatrixType.F ,i - 1, j) + self.scoring.gapStart(first[i-1])
-                    prevIx = f.getScore(MatrixType.IX ,i - 1, j) + self.scoring.gapStart(first[i-1])
+                    prevF = f.getScore(MatrixType.F ,i - 1, j) + gapStartA[i - 1]
+                    prevIx = f.getScore(MatrixType.IX ,i - 1, j) + gapStartA[i - 1]
                     prevIy = f.getScore(MatrixType.IY ,i - 1, j)
                     maxScore = max(prevF, prevIx, prevIy)
-                    dirGb = [
-                        dir for
-                        score, dir in [
-                            (prevF, MatrixType.F),
-                            (prevIx, MatrixType.IX),
-                            (prevIy, MatrixType.IY)
-                        ]
-                        if score == maxScore
-                    ]
-                    f.setScore(MatrixType.IY ,i,j, maxScore + self.scoring.gapExtension(first[i-1]))
-                    f.setDirection(MatrixType.IY ,i, j, dirGb)
+                    mask = ((prevF == maxScore)
+                            | (prevIx == maxScore) << 1
+                            | (prevIy == maxScore) << 2)
+                    if fast:
+                        mask &= -mask
+                    f.setScore(MatrixType.IY ,i,j, maxScore + gapExtensionA[i - 1])
+                    f.setDirectionMask(MatrixType.IY ,i, j, mask)
 
         return f
 
@@ -382,13 +1475,30 @@ class GlobalSequenceAligner(SequenceAligner):
         return alignments
 
     def backtraceFrom(self, first, second, f, i, j, alignments, alignment, current):
-        if i == 0 or j == 0:
-            if current == MatrixType.F:
-                alignments.append(alignment.reversed())
-        else:
-            m, n = f.shape
-            allDirections = f.getDirection(current, i, j)
-            directions = allDirections[:1] if self._fastBacktrace else allDirections
+        # Iterative depth-first search over the direction graph. The shared
+        # alignment buffer is mutated by 'push'/'pop' entries and snapshotted
+        # by reversed() only at terminal cells; an explicit stack replaces
+        # recursion, whose depth would otherwise grow with m + n. Children
+        # are appended in reverse so alignments keep the recursive order.
+        m, n = f.shape
+        stack = [('node', i, j, current)]
+        while stack:
+            entry = stack.pop()
+            operation = entry[0]
+            if operation == 'push':
+                alignment.push(entry[1], entry[2], entry[3])
+                continue
+            if operation == 'pop':
+                alignment.pop()
+                continue
+            _, i, j, current = entry
+            if i == 0 or j == 0:
+                if current == MatrixType.F:
+                    alignments.append(alignment.reversed())
+                continue
+            # The fills already store single-direction masks when
+            # _fastBacktrace is set, so no stripping is needed here.
+            directions = _DIRECTIONS_BY_MASK[f.getDirectionMask(current, i, j)]
             c = f.getScore(current, i, j)
             a = first[i - 1]
             b = second[j - 1]
@@ -396,58 +1506,129 @@ class GlobalSequenceAligner(SequenceAligner):
             if current == MatrixType.F:
                 for dir in directions:
                     p = f.getScore(dir, i - 1, j - 1)
-                    alignment.push(a, b, c - p)
-                    self.backtraceFrom(first, second, f, i - 1, j - 1,
-                                    alignments, alignment, dir)
-                    alignment.pop()
+                    stack.append(('pop',))
+                    stack.append(('node', i - 1, j - 1, dir))
+                    stack.append(('push', a, b, c - p))
             elif current == MatrixType.IX:
                 if i == m - 1:
                     for dir in directions:
                         y = f.getScore(dir, i, j - 1)
                         if c == y:
-                            self.backtraceFrom(first, second, f, i, j - 1,
-                                               alignments, alignment, dir)
-                else: 
+                            stack.append(('node', i, j - 1, dir))
+                else:
                     for dir in directions:
                         y = f.getScore(dir, i, j - 1)
-                        alignment.push(alignment.gap, b, c - y)
-                        self.backtraceFrom(first, second, f, i, j - 1,
-                                           alignments, alignment, dir)
-                        alignment.pop()
+                        stack.append(('pop',))
+                        stack.append(('node', i, j - 1, dir))
+                        stack.append(('push', alignment.gap, b, c - y))
             elif current == MatrixType.IY:
                 if j == n - 1:
-                     for dir in directions:
+                    for dir in directions:
                         x = f.getScore(dir, i - 1, j)
                         if c == x:
-                            self.backtraceFrom(first, second, f, i - 1, j,
-                                            alignments, alignment, dir)
+                            stack.append(('node', i - 1, j, dir))
                 else:
                     for dir in directions:
                         x = f.getScore(dir, i - 1, j)
-                        alignment.push(a, alignment.gap, c - x)
-                        self.backtraceFrom(first, second, f, i - 1, j,
-                                        alignments, alignment, dir)
-                        alignment.pop()
+                        stack.append(('pop',))
+                        stack.append(('node', i - 1, j, dir))
+                        stack.append(('push', a, alignment.gap, c - x))
 
 
 class StrictGlobalSequenceAligner(SequenceAligner):
+    _parasailAlgorithm = 'nw'
+
+    def __init__(self, scoring, gapScore, gapExtensionScore, band=None,
+                 backend=None):
+        super(StrictGlobalSequenceAligner, self).__init__(scoring, gapScore, gapExtensionScore, band, backend)
+
+    def _parasailPenalties(self):
+        # This aligner charges the linear self.gapScore per gap element.
+        penalty = -self.gapScore
+        if penalty < 0:
+            return None
+        return penalty, penalty
+
+    def _batchScores(self, first, seconds, lengths):
+        return _scoreBatchStrictGlobalMatrix(
+            first, seconds, lengths,
+            self.scoring.matchScore, self.scoring.mismatchScore,
+            self.gapScore)
+
+    def _cudaBatchScores(self, first, seconds, lengths):
+        return _cudaScoreBatch(
+            'scoreBatchStrictGlobal', first, seconds, lengths,
+            (self.scoring.matchScore, self.scoring.mismatchScore,
+             self.gapScore))
 
-    def __init__(self, scoring, gapScore, gapExtensionScore):
-        super(StrictGlobalSequenceAligner, self).__init__(scoring, gapScore, gapExtensionScore)
+    def align(self, first, second, backtrace=False):
+        if not backtrace and self.band is None and self.backend is None:
+            # Only the final score is needed, so the full O(mn) matrix can be
+            # replaced by two rolling rows of F.
+            return self.computeScoreOnly(first, second)
+        return super(StrictGlobalSequenceAligner, self).align(
+            first, second, backtrace)
+
+    def computeScoreOnly(self, first, second):
+        m = len(first) + 1
+        n = len(second) + 1
+        if numba is not None and self._integralScoring():
+            a = _encodedElements(first)
+            b = _encodedElements(second)
+            if a is not None and b is not None:
+                return int(_scoreStrictGlobalMatrix(
+                    a, b,
+                    self.scoring.matchScore, self.scoring.mismatchScore,
+                    self.gapScore))
+        sub = self._substitutionScores(first, second)
+        previous = [j * self.gapScore for j in range(n)]
+        current = [0] * n
+        for i in range(1, m):
+            current[0] = previous[0] + self.gapScore
+            row = sub[i - 1]
+            for j in range(1, n):
+                # Match elements, gap on first sequence, gap on second
+                # sequence.
+                current[j] = max(previous[j - 1] + row[j - 1],
+                                 previous[j] + self.gapScore,
+                                 current[j - 1] + self.gapScore)
+            previous, current = current, previous
+        return previous[n - 1]
 
     def computeAlignmentMatrix(self, first, second):
         m = len(first) + 1
         n = len(second) + 1
-        f = AlignmentMatrix((m,n))
+        f = AlignmentMatrix((m,n), dtype=self._scoreDtype(first, second))
+        if self.band is not None:
+            f.scores[:, 1:, 1:] = f.minScore()
         for i in range(1, m):
             f.setScore(MatrixType.F ,i, 0, f.getScore(MatrixType.F ,i - 1, 0) + self.gapScore)
         for j in range(1, n):
             f.setScore(MatrixType.F ,0, j, f.getScore(MatrixType.F ,0, j - 1) + self.gapScore)
+        if isinstance(self.scoring, SimpleScoring):
+            a = _encodedElements(first)
+            b = _encodedElements(second)
+            if a is not None and b is not None:
+                if numba is not None:
+                    _fillStrictGlobalMatrix(
+                        a, b,
+                        self.scoring.matchScore, self.scoring.mismatchScore,
+                        self.gapScore,
+                        -1 if self.band is None else self.band,
+                        f.scores)
+                    return f
+                if self.band is None:
+                    _fillStrictGlobalMatrixWavefront(
+                        a, b,
+                        self.scoring.matchScore, self.scoring.mismatchScore,
+                        self.gapScore, f.scores)
+                    return f
+        sub = self._substitutionScores(first, second)
         for i in range(1, m):
-            for j in range(1, n):
+            for j in self._columnRange(i, n):
                 # Match elements.
                 ab = f.getScore(MatrixType.F ,i - 1, j - 1) \
-                    + self.scoring(first[i - 1], second[j - 1])
+                    + sub[i - 1][j - 1]
 
                 # Gap on first sequence.
                 ga = f.getScore(MatrixType.F ,i, j - 1) + self.gapScore
@@ -504,84 +1685,129 @@ class StrictGlobalSequenceAligner(SequenceAligner):
 
 
 class LocalSequenceAligner(SequenceAligner):
+    _parasailAlgorithm = 'sw'
+    # parasail encodes the traceback start offsets as leading I/D operations.
+    _parasailTrimEndGaps = True
 
-    def __init__(self, scoring, minScore=None):
-        super(LocalSequenceAligner, self).__init__(scoring, 0, 0)
+    def __init__(self, scoring, minScore=None, band=None, backend=None):
+        super(LocalSequenceAligner, self).__init__(scoring, 0, 0, band,
+                                                   backend)
         self.minScore = minScore
 
+    def _batchScores(self, first, seconds, lengths):
+        return _scoreBatchLocalMatrix(
+            first, seconds, lengths,
+            self.scoring.matchScore, self.scoring.mismatchScore,
+            self.scoring.gapStartScore, self.scoring.gapExtensionScore)
+
+    def _cudaBatchScores(self, first, seconds, lengths):
+        return _cudaScoreBatch(
+            'scoreBatchLocal', first, seconds, lengths,
+            (self.scoring.matchScore, self.scoring.mismatchScore,
+             self.scoring.gapStartScore, self.scoring.gapExtensionScore))
+
+    def _alignParasail(self, first, second, backtrace):
+        if self.minScore is not None:
+            # Backtraces from every cell above minScore cannot be reproduced
+            # by parasail's single traceback.
+            return None
+        result = super(LocalSequenceAligner, self)._alignParasail(
+            first, second, backtrace)
+        if result is None:
+            return None
+        score = result[0] if backtrace else result
+        if score <= 0:
+            # parasail reports no meaningful score or traceback when no
+            # positive-scoring local alignment exists.
+            return None
+        return result
+
     def computeAlignmentMatrix(self, first, second):
         m = len(first) + 1
         n = len(second) + 1
-        f = AlignmentMatrix((m, n))
-        min = -sys.maxsize
+        f = AlignmentMatrix((m, n), dtype=self._scoreDtype(first, second))
+        min = f.minScore()
+        if self.band is not None:
+            f.scores[:, 1:, 1:] = min
 
         for i in range(1, m):
             f.setScore(MatrixType.F, i, 0, min)
             f.setScore(MatrixType.IX, i, 0, min)
             f.setScore(MatrixType.IY, i, 0, max(0, self.gapScore + i * self.gapExtensionScore))
-            f.setDirection(MatrixType.IY, i, 0, [MatrixType.IY])
+            f.setDirectionMask(MatrixType.IY, i, 0, 1 << MatrixType.IY)
 
         for i in range(1, n):
             f.setScore(MatrixType.F, 0, i, min)
             f.setScore(MatrixType.IX, 0, i, max(0, self.gapScore + i * self.gapExtensionScore))
             f.setScore(MatrixType.IY, 0, i, min)
-            f.setDirection(MatrixType.IX, 0, i, [MatrixType.IX])
+            f.setDirectionMask(MatrixType.IX, 0, i, 1 << MatrixType.IX)
 
         f.setScore(MatrixType.IX, 0, 0, min)
         f.setScore(MatrixType.IY, 0, 0, min)
 
+        if isinstance(self.scoring, SimpleScoring):
+            a = _encodedElements(first)
+            b = _encodedElements(second)
+            if a is not None and b is not None:
+                if numba is not None:
+                    _fillLocalMatrix(
+                        a, b,
+                        self.scoring.matchScore, self.scoring.mismatchScore,
+                        self.scoring.gapStartScore,
+                        self.scoring.gapExtensionScore,
+                        -1 if self.band is None else self.band,
+                        f.scores, f.directions)
+                    return f
+                if self.band is None:
+                    _fillLocalMatrixWavefront(
+                        a, b,
+                        self.scoring.matchScore, self.scoring.mismatchScore,
+                        self.scoring.gapStartScore,
+                        self.scoring.gapExtensionScore,
+                        f.scores, f.directions)
+                    return f
+        sub = self._substitutionScores(first, second)
+        gapStartA, gapExtensionA = self._gapScores(first)
+        gapStartB, gapExtensionB = self._gapScores(second)
         for i in range(1, m):
-            for j in range(1, n):
+            for j in self._columnRange(i, n):
                 # Match elements.
                 prevF = f.getScore(MatrixType.F ,i - 1, j - 1)
                 prevIx = f.getScore(MatrixType.IX ,i - 1, j - 1)
                 prevIy = f.getScore(MatrixType.IY ,i - 1, j - 1)
                 maxScore = max(prevF, prevIx, prevIy)
-                dirAb = [
-                    dir for
-                    score, dir in [
-                        (prevF, MatrixType.F),
-                        (prevIx, MatrixType.IX),
-                        (prevIy, MatrixType.IY)
-                    ]
-                    if score == maxScore
-                ]
-                f.setScore(MatrixType.F ,i, j, max(0, maxScore + self.scoring(first[i - 1], second[j - 1])))
-                f.setDirection(MatrixType.F ,i, j, dirAb if maxScore > 0 else dirAb[:1])
+                # Branchless tie mask: bit t is set iff MatrixType(t) ties;
+                # mask & -mask keeps only the lowest tied direction when the
+                # cell is clamped to zero.
+                mask = ((prevF == maxScore)
+                        | (prevIx == maxScore) << 1
+                        | (prevIy == maxScore) << 2)
+                if maxScore <= 0:
+                    mask &= -mask
+                f.setScore(MatrixType.F ,i, j, max(0, maxScore + sub[i - 1][j - 1]))
+                f.setDirectionMask(MatrixType.F ,i, j, mask)
 
                 # Gap on sequenceA.
-                prevF = f.getScore(MatrixType.F ,i, j - 1) + self.scoring.gapStart(second[j-1])
+                prevF = f.getScore(MatrixType.F ,i, j - 1) + gapStartB[j - 1]
                 prevIx = f.getScore(MatrixType.IX ,i, j - 1)
-                prevIy = f.getScore(MatrixType.IY ,i, j - 1) + self.scoring.gapStart(second[j-1])
+                prevIy = f.getScore(MatrixType.IY ,i, j - 1) + gapStartB[j - 1]
                 maxScore = max(prevF, prevIx, prevIy)
-                dirGa = [
-                    dir for
-                    score, dir in [
-                        (prevF, MatrixType.F),
-                        (prevIx, MatrixType.IX),
-                        (prevIy, MatrixType.IY)
-                    ]
-                    if score == maxScore
-                ]
-                f.setScore(MatrixType.IX ,i, j, max(0, maxScore + self.scoring.gapExtension(second[j-1])))
-                f.setDirection(MatrixType.IX ,i, j, dirGa)
+                mask = ((prevF == maxScore)
+                        | (prevIx == maxScore) << 1
+                        | (prevIy == maxScore) << 2)
+                f.setScore(MatrixType.IX ,i, j, max(0, maxScore + gapExtensionB[j - 1]))
+                f.setDirectionMask(MatrixType.IX ,i, j, mask)
 
                 # Gap on sequenceB.
-                prevF = f.getScore(MatrixType.F ,i - 1, j) + self.scoring.gapStart(first[i-1])
-                prevIx = f.getScore(MatrixType.IX ,i - 1, j) + self.scoring.gapStart(first[i-1])
+                prevF = f.getScore(MatrixType.F ,i - 1, j) + gapStartA[i - 1]
+                prevIx = f.getScore(MatrixType.IX ,i - 1, j) + gapStartA[i - 1]
                 prevIy = f.getScore(MatrixType.IY ,i - 1, j)
                 maxScore = max(prevF, prevIx, prevIy)
-                dirGb = [
-                    dir for
-                    score, dir in [
-                        (prevF, MatrixType.F),
-                        (prevIx, MatrixType.IX),
-                        (prevIy, MatrixType.IY)
-                    ]
-                    if score == maxScore
-                ]
-                f.setScore(MatrixType.IY ,i,j, max(0, maxScore + self.scoring.gapExtension(first[i-1])))
-                f.setDirection(MatrixType.IY ,i, j, dirGb)
+                mask = ((prevF == maxScore)
+                        | (prevIx == maxScore) << 1
+                        | (prevIy == maxScore) << 2)
+                f.setScore(MatrixType.IY ,i,j, max(0, maxScore + gapExtensionA[i - 1]))
+                f.setDirectionMask(MatrixType.IY ,i, j, mask)
 
         return f
 
@@ -602,10 +1828,23 @@ class LocalSequenceAligner(SequenceAligner):
         return alignments
 
     def backtraceFrom(self, first, second, f, i, j, alignments, alignment, current):
-        if f.getScore(current, i, j) == 0:
-            alignments.append(alignment.reversed())
-        else:
-            directions = f.getDirection(current, i, j)
+        # Iterative depth-first search sharing one alignment buffer; see
+        # GlobalSequenceAligner.backtraceFrom.
+        stack = [('node', i, j, current)]
+        while stack:
+            entry = stack.pop()
+            operation = entry[0]
+            if operation == 'push':
+                alignment.push(entry[1], entry[2], entry[3])
+                continue
+            if operation == 'pop':
+                alignment.pop()
+                continue
+            _, i, j, current = entry
+            if f.getScore(current, i, j) == 0:
+                alignments.append(alignment.reversed())
+                continue
+            directions = _DIRECTIONS_BY_MASK[f.getDirectionMask(current, i, j)]
             c = f.getScore(current, i, j)
             a = first[i - 1]
             b = second[j - 1]
@@ -613,21 +1852,18 @@ class LocalSequenceAligner(SequenceAligner):
             if current == MatrixType.F:
                 for dir in directions:
                     p = f.getScore(dir, i - 1, j - 1)
-                    alignment.push(a, b, c - p)
-                    self.backtraceFrom(first, second, f, i - 1, j - 1,
-                                    alignments, alignment, dir)
-                    alignment.pop()
+                    stack.append(('pop',))
+                    stack.append(('node', i - 1, j - 1, dir))
+                    stack.append(('push', a, b, c - p))
             elif current == MatrixType.IX:
                 for dir in directions:
                     y = f.getScore(dir, i, j - 1)
-                    alignment.push(alignment.gap, b, c - y)
-                    self.backtraceFrom(first, second, f, i, j - 1,
-                                        alignments, alignment, dir)
-                    alignment.pop()
+                    stack.append(('pop',))
+                    stack.append(('node', i, j - 1, dir))
+                    stack.append(('push', alignment.gap, b, c - y))
             elif current == MatrixType.IY:
                 for dir in directions:
                     x = f.getScore(dir, i - 1, j)
-                    alignment.push(a, alignment.gap, c - x)
-                    self.backtraceFrom(first, second, f, i - 1, j,
-                                        alignments, alignment, dir)
-                    alignment.pop()
+                    stack.append(('pop',))
+                    stack.append(('node', i - 1, j, dir))
+                    stack.append(('push', a, alignment.gap, c - x))
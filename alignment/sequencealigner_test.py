@@ -1,7 +1,13 @@
 from abc import ABCMeta
 
+import numpy as np
+import pytest
+
 from .vocabulary import Vocabulary
 from .sequence import Sequence
+from .sequencealigner import parasail
+from .sequencealigner import _aligner
+from .sequencealigner import SequenceAlignment
 from .sequencealigner import SimpleScoring
 from .sequencealigner import GlobalSequenceAligner
 from .sequencealigner import StrictGlobalSequenceAligner
@@ -16,6 +22,7 @@ DEFAULT_GAP_EXTENSION_SCORE = -1
 
 DEFAULT_SCORING = SimpleScoring(DEFAULT_MATCH_SCORE, DEFAULT_MISMATCH_SCORE, 0, DEFAULT_GAP_SCORE)
 AFFINE_GAP_SCORING = SimpleScoring(DEFAULT_MATCH_SCORE, DEFAULT_MISMATCH_SCORE, DEFAULT_GAP_START_SCORE, DEFAULT_GAP_EXTENSION_SCORE)
+FLOAT_SCORING = SimpleScoring(2.5, -1.5, -0.5, -1.25)
 
 
 def _align(first, second, aligner, **kwargs):
@@ -235,6 +242,227 @@ class TestStrictGlobalSequenceAligner(SequenceAlignerTests):
         assert score == DEFAULT_MATCH_SCORE * 4 + DEFAULT_GAP_SCORE * 2
         assert alignments[0].score == score
 
+class TestBandedAlignment(object):
+    # A band wider than the length difference must reproduce the unbanded
+    # optimum.
+
+    def test_global_wide_band_matches_unbanded(self):
+        score, alignments = _align(
+            'xaby', 'aob', GlobalSequenceAligner(AFFINE_GAP_SCORING, band=4))
+        referenceScore, _ = _align(
+            'xaby', 'aob', GlobalSequenceAligner(AFFINE_GAP_SCORING))
+        assert score == referenceScore
+        assert str(alignments[0].first) == 'a - b'
+        assert str(alignments[0].second) == 'a o b'
+
+    def test_strict_global_wide_band_matches_unbanded(self):
+        score, alignments = _align(
+            'xaby', 'aob',
+            StrictGlobalSequenceAligner(
+                DEFAULT_SCORING, DEFAULT_GAP_SCORE, DEFAULT_GAP_EXTENSION_SCORE,
+                band=4))
+        assert score == DEFAULT_MATCH_SCORE * 2 + DEFAULT_GAP_SCORE * 3
+        assert str(alignments[0].first) == 'x a - b y'
+        assert str(alignments[0].second) == '- a o b -'
+
+    def test_local_wide_band_matches_unbanded(self):
+        score, alignments = _align(
+            'xabcabcy', 'abc', LocalSequenceAligner(AFFINE_GAP_SCORING, band=8))
+        assert score == DEFAULT_MATCH_SCORE * 3
+        assert len(alignments) == 2
+
+    def test_band_narrower_than_length_difference_is_rejected(self):
+        with pytest.raises(ValueError):
+            _align('xabcabcy', 'abc',
+                   GlobalSequenceAligner(AFFINE_GAP_SCORING, band=2))
+
+
+class TestFloatScoring(object):
+    # Fractional scores must survive both the alignment matrix and the
+    # per-column score buffer without truncation, so the alignment scores
+    # have to add up to the matrix optimum exactly.
+
+    def align(self, aligner):
+        score, alignments = _align('123421', '12441', aligner)
+        assert all(a.score == score for a in alignments)
+        return score, alignments
+
+    def test_global(self):
+        score, alignments = self.align(GlobalSequenceAligner(FLOAT_SCORING))
+        assert score == 6.75
+        assert len(alignments) == 2
+
+    def test_strict_global(self):
+        score, alignments = self.align(
+            StrictGlobalSequenceAligner(FLOAT_SCORING, -0.5, -1.25))
+        assert score == 8.5
+        assert len(alignments) == 2
+
+    def test_local(self):
+        score, alignments = self.align(LocalSequenceAligner(FLOAT_SCORING))
+        assert score == 6.75
+        assert len(alignments) == 2
+
+
+class TestAlignmentFormatting(object):
+    # Both rows pad each column to the widest decoded token in it.
+
+    def test_str_pads_mixed_width_tokens(self):
+        vocab = Vocabulary()
+        aligner = StrictGlobalSequenceAligner(
+            DEFAULT_SCORING, DEFAULT_GAP_SCORE, DEFAULT_GAP_EXTENSION_SCORE)
+        _, alignments = aligner.align(
+            vocab.encodeSequence(
+                Sequence(['what', 'a', 'beautiful', 'day'])),
+            vocab.encodeSequence(
+                Sequence(['what', 'a', 'disappointingly', 'bad', 'day'])),
+            backtrace=True)
+        decoded = {str(vocab.decodeSequenceAlignment(a)) for a in alignments}
+        assert decoded == {
+            'what a beautiful       -   day\n'
+            'what a disappointingly bad day',
+            'what a -               beautiful day\n'
+            'what a disappointingly bad       day',
+        }
+
+    def test_str_of_empty_alignment(self):
+        assert str(SequenceAlignment(Sequence([]), Sequence([]))) == '\n'
+
+
+class TestCythonKernel(object):
+
+    def test_global_int32_path(self):
+        # Scores this large overflow the int16 bound, forcing the int32
+        # matrix dtype that the compiled global kernel dispatches on; the
+        # result must match the small-score alignment scaled up.
+        if _aligner is None:
+            pytest.skip('Cython extension not built')
+        scale = 10000
+        scoring = SimpleScoring(DEFAULT_MATCH_SCORE * scale,
+                                DEFAULT_MISMATCH_SCORE * scale,
+                                DEFAULT_GAP_START_SCORE * scale,
+                                DEFAULT_GAP_EXTENSION_SCORE * scale)
+        aligner = GlobalSequenceAligner(scoring)
+        vocab = Vocabulary()
+        first = vocab.encodeSequence(Sequence('xaby'))
+        second = vocab.encodeSequence(Sequence('aob'))
+        f = aligner.computeAlignmentMatrix(first, second)
+        assert f.scores.dtype == np.int32
+        score, alignments = _align('xaby', 'aob', aligner)
+        assert score == (DEFAULT_MATCH_SCORE * 2 + DEFAULT_GAP_SCORE) * scale
+        assert str(alignments[0].first) == 'a - b'
+        assert str(alignments[0].second) == 'a o b'
+        assert alignments[0].score == score
+
+
+class TestScoreOnly(object):
+    # align() without backtrace takes the two-row kernel and rolling-matrix
+    # shortcuts; their scores must match the full backtrace path.
+
+    def check(self, aligner):
+        vocab = Vocabulary()
+        first = vocab.encodeSequence(Sequence('xabcabcy'))
+        second = vocab.encodeSequence(Sequence('aobc'))
+        score, _ = aligner.align(first, second, backtrace=True)
+        assert aligner.align(first, second) == score
+
+    def test_global(self):
+        self.check(GlobalSequenceAligner(AFFINE_GAP_SCORING))
+
+    def test_strict_global(self):
+        self.check(StrictGlobalSequenceAligner(
+            DEFAULT_SCORING, DEFAULT_GAP_SCORE, DEFAULT_GAP_EXTENSION_SCORE))
+
+    def test_local(self):
+        self.check(LocalSequenceAligner(AFFINE_GAP_SCORING))
+
+
+class TestAlignBatch(object):
+    # alignBatch must reproduce align() pair by pair, whichever kernel ends
+    # up scoring the batch.
+
+    ALIGNERS = [
+        GlobalSequenceAligner(AFFINE_GAP_SCORING),
+        StrictGlobalSequenceAligner(
+            DEFAULT_SCORING, DEFAULT_GAP_SCORE, DEFAULT_GAP_EXTENSION_SCORE),
+        LocalSequenceAligner(AFFINE_GAP_SCORING),
+    ]
+
+    def encode(self):
+        vocab = Vocabulary()
+        first = vocab.encodeSequence(Sequence('xabcabcy'))
+        seconds = [vocab.encodeSequence(Sequence(s))
+                   for s in ('abc', 'xy', 'xabcabcy', 'b')]
+        return first, seconds
+
+    def test_matches_align(self):
+        first, seconds = self.encode()
+        for aligner in self.ALIGNERS:
+            expected = [aligner.align(first, second) for second in seconds]
+            assert aligner.alignBatch(first, seconds) == expected
+
+    def test_accepts_generator(self):
+        first, seconds = self.encode()
+        for aligner in self.ALIGNERS:
+            expected = [aligner.align(first, second) for second in seconds]
+            assert aligner.alignBatch(first, iter(seconds)) == expected
+
+
+class TestAlignMany(object):
+
+    def test_matches_serial_align(self):
+        # The pool must return the align() results in pair order, with and
+        # without backtrace.
+        vocab = Vocabulary()
+        sequences = [vocab.encodeSequence(Sequence(s))
+                     for s in ('xabcabcy', 'abc', 'xaby', 'aob')]
+        pairs = [(a, b) for a in sequences for b in sequences]
+        aligner = GlobalSequenceAligner(AFFINE_GAP_SCORING)
+        assert aligner.alignMany(pairs, workers=2) == [
+            aligner.align(a, b) for a, b in pairs]
+        results = aligner.alignMany(pairs, workers=2, backtrace=True)
+        for (score, alignments), (a, b) in zip(results, pairs):
+            expectedScore, expected = aligner.align(a, b, backtrace=True)
+            assert score == expectedScore
+            assert [str(x) for x in alignments] == [str(x) for x in expected]
+
+
+class TestParasailBackend(object):
+
+    def test_global_matches_native(self):
+        if parasail is None:
+            pytest.skip('parasail is not installed')
+        score, alignments = _align(
+            'xaby', 'aob',
+            GlobalSequenceAligner(AFFINE_GAP_SCORING, backend='parasail'))
+        assert score == DEFAULT_MATCH_SCORE * 2 + DEFAULT_GAP_SCORE
+        assert str(alignments[0].first) == 'a - b'
+        assert str(alignments[0].second) == 'a o b'
+        assert alignments[0].score == score
+
+    def test_strict_global_matches_native(self):
+        if parasail is None:
+            pytest.skip('parasail is not installed')
+        score, alignments = _align(
+            'xaby', 'aob',
+            StrictGlobalSequenceAligner(
+                DEFAULT_SCORING, DEFAULT_GAP_SCORE, DEFAULT_GAP_EXTENSION_SCORE,
+                backend='parasail'))
+        assert score == DEFAULT_MATCH_SCORE * 2 + DEFAULT_GAP_SCORE * 3
+        assert str(alignments[0].first) == 'x a - b y'
+        assert str(alignments[0].second) == '- a o b -'
+
+    def test_local_matches_native(self):
+        if parasail is None:
+            pytest.skip('parasail is not installed')
+        score, alignments = _align(
+            'xaby', 'aob',
+            LocalSequenceAligner(AFFINE_GAP_SCORING, backend='parasail'))
+        assert score == DEFAULT_MATCH_SCORE * 2 + DEFAULT_GAP_SCORE
+        assert str(alignments[0].first) == 'a - b'
+        assert str(alignments[0].second) == 'a o b'
+
+
 class TestLocalSequenceAligner(SequenceAlignerTests):
     ALIGNER = LocalSequenceAligner(AFFINE_GAP_SCORING)
 
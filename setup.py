@@ -2,6 +2,21 @@
 # coding=utf-8
 
 from distutils.core import setup
+from distutils.extension import Extension
+
+# The Cython extension is optional; the pure Python package works without it.
+# -O2, not -O3: gcc 12's loop distribution (enabled at -O3) reorders the fill
+# loop across the in-row dependence on scores[IX, i, j - 1] and produces
+# wrong matrices.
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        [Extension('alignment._aligner', ['alignment/_aligner.pyx'],
+                   extra_compile_args=['-O2'])],
+        language_level=3,
+    )
+except ImportError:
+    ext_modules = []
 
 # noinspection PyArgumentList
 setup(
@@ -14,5 +29,6 @@ setup(
     license='BSD 3-Clause License',
     description='Native Python library for generic sequence alignment.',
     long_description=open('README.rst').read(),
-    requires=['six'],
+    requires=['numpy'],
+    ext_modules=ext_modules,
 )